@@ -2,14 +2,20 @@
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Any
-from fastapi import APIRouter, UploadFile, File, HTTPException, Response
+from typing import Dict, Any, Optional
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import base64
 
 # Import complete flow service
 from services.complete_flow import process_voice_complete_flow
+from services.elevenlabs_stt import audio_content_hash
 from services.event_store import event_store
+from services.idempotency import voice_idempotency
+from services.incident_stats import incident_stats, GRANULARITIES
+from services.event_archive import event_archiver
+from services.ndjson_export import build_time_range_query, stream_ndjson, to_utc_iso, EXPORT_BATCH_SIZE
 from websocket.ws_manager import manager
 
 logger = logging.getLogger(__name__)
@@ -23,14 +29,20 @@ class EmergencyEvent(BaseModel):
     type: str
     severity: int
     assistant_reply: str
+    degraded: bool = False
     timestamp: str
 
 @router.post("/voice", response_model=EmergencyEvent)
-async def process_voice(audio: UploadFile = File(...)) -> Dict[str, Any]:
+async def process_voice(audio: UploadFile = File(...),
+                        idempotency_key: Optional[str] = Header(None)) -> Dict[str, Any]:
     """Process voice recording through complete flow with Gemini API integration
     
+    Repeated uploads of the same audio (with the same Idempotency-Key header,
+    or without one) share one pipeline run and are only broadcast once.
+    
     Args:
         audio: Audio file upload
+        idempotency_key: Optional client-supplied Idempotency-Key header
     
     Returns:
         EmergencyEvent: Processed emergency event
@@ -42,8 +54,22 @@ async def process_voice(audio: UploadFile = File(...)) -> Dict[str, Any]:
         audio_data = await audio.read()
         logger.info(f"Audio data received: {len(audio_data)} bytes")
         
+        # Keys are bound to the audio so a reused or colliding key can never
+        # return another recording's event
+        audio_hash = audio_content_hash(audio_data)
+        if idempotency_key:
+            key = f"key:{idempotency_key}:{audio_hash}"
+        else:
+            key = f"audio:{audio_hash}"
+        
         # Process through complete flow: STT -> Classification -> Gemini Response -> TTS -> Storage
-        event = await process_voice_complete_flow(audio_data)
+        event, duplicate = await voice_idempotency.run(
+            key, lambda: process_voice_complete_flow(audio_data)
+        )
+        
+        if duplicate:
+            logger.info(f"Duplicate upload resolved to existing event: {event['id']}")
+            return event
         
         # Broadcast to WebSocket clients
         await manager.broadcast(event)
@@ -73,6 +99,115 @@ async def get_events(limit: int = 50):
         logger.error(f"Error retrieving events: {e}")
         raise HTTPException(status_code=500, detail=f"Error retrieving events: {str(e)}")
 
+@router.get("/events/export")
+async def export_events(start: Optional[datetime] = None,
+                        end: Optional[datetime] = None,
+                        type: Optional[str] = None,
+                        include_audio: bool = False,
+                        gzip: bool = False):
+    """Stream the full event history as NDJSON
+    
+    Archived events (older than the retention hot window, when archiving is
+    enabled) are streamed first, followed by the events still in MongoDB.
+    
+    Args:
+        start: Only include events at or after this time
+        end: Only include events before this time
+        type: Only include events of this emergency type
+        include_audio: Include base64 audio responses in the export
+        gzip: Gzip-compress the stream
+    
+    Returns:
+        Streaming NDJSON response, one event per line
+    """
+    emergency_type = type.upper() if type else None
+    query = build_time_range_query("timestamp", start, end)
+    if emergency_type:
+        query["type"] = emergency_type
+    
+    logger.info(f"Exporting events with filter {query} (gzip={gzip})")
+    
+    async def full_history():
+        async for event in event_archiver.scan(
+            to_utc_iso(start) if start else None,
+            to_utc_iso(end) if end else None,
+            emergency_type=emergency_type,
+            include_audio=include_audio
+        ):
+            yield event
+        async for event in event_store.iter_events(query, include_audio=include_audio,
+                                                   batch_size=EXPORT_BATCH_SIZE):
+            yield event
+    
+    filename = "events.ndjson.gz" if gzip else "events.ndjson"
+    return StreamingResponse(
+        stream_ndjson(full_history(), batch_size=EXPORT_BATCH_SIZE, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/archive/events")
+async def export_archived_events(start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None,
+                                 type: Optional[str] = None,
+                                 include_audio: bool = False,
+                                 gzip: bool = False):
+    """Stream archived events (older than the hot window) as NDJSON
+    
+    Args:
+        start: Only include events at or after this time
+        end: Only include events before this time
+        type: Only include events of this emergency type
+        include_audio: Include base64 audio responses in the export
+        gzip: Gzip-compress the stream
+    
+    Returns:
+        Streaming NDJSON response, one event per line
+    """
+    events = event_archiver.scan(
+        to_utc_iso(start) if start else None,
+        to_utc_iso(end) if end else None,
+        emergency_type=type.upper() if type else None,
+        include_audio=include_audio
+    )
+    filename = "archived_events.ndjson.gz" if gzip else "archived_events.ndjson"
+    return StreamingResponse(
+        stream_ndjson(events, batch_size=EXPORT_BATCH_SIZE, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.get("/stats")
+async def get_stats(granularity: str = "hour",
+                    start: Optional[datetime] = None,
+                    end: Optional[datetime] = None,
+                    type: Optional[str] = None,
+                    severity: Optional[int] = None):
+    """Get event counts by type and severity per time bucket
+    
+    Args:
+        granularity: Bucket size, "minute" or "hour"
+        start: Only include buckets at or after this time
+        end: Only include buckets before this time
+        type: Only count events of this emergency type
+        severity: Only count events of this severity
+    
+    Returns:
+        Buckets ordered by time, plus totals by type and severity
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    
+    try:
+        return await incident_stats.query(
+            granularity, start, end,
+            emergency_type=type.upper() if type else None,
+            severity=severity
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving stats: {str(e)}")
+
 @router.get("/audio/{event_id}")
 async def get_audio_response(event_id: str):
     """Get audio response for a specific event
@@ -0,0 +1,232 @@
+"""Reclassify historical events with the current keyword classifier
+
+Streams the events collection in _id order (without audio), classifies
+transcripts across a process pool and writes changed type/severity values
+back with batched bulk_write. Progress is checkpointed after every batch so
+an interrupted run resumes where it stopped; a run that finished is marked
+completed, and the next run starts from the beginning again. Incident stat
+rollups for the hours containing changed events are recomputed from the
+events collection after each batch.
+
+Usage (from the backend directory):
+    python -m scripts.backfill_classification --dry-run
+    python -m scripts.backfill_classification --workers 4 --batch-size 2000
+"""
+from dotenv import load_dotenv
+from pathlib import Path
+import os
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+load_dotenv(ROOT_DIR / '.env')
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from services.classifier import classify_emergency_by_keywords
+from services.incident_stats import bucket_start, incident_stats
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("backfill_classification")
+
+DEFAULT_CHECKPOINT = ROOT_DIR / ".backfill_checkpoint.json"
+
+def _init_worker() -> None:
+    # The classifier logs every call; keep worker output to warnings
+    logging.getLogger("services.classifier").setLevel(logging.WARNING)
+
+def classify_chunk(transcripts: List[str]) -> List[Tuple[str, int]]:
+    """Classify a chunk of transcripts in a worker process
+
+    Args:
+        transcripts: Transcripts to classify
+
+    Returns:
+        list: (type, severity) per transcript
+    """
+    results = []
+    for transcript in transcripts:
+        classification = classify_emergency_by_keywords(transcript or "")
+        results.append((classification["type"], classification["severity"]))
+    return results
+
+def new_checkpoint() -> Dict[str, Any]:
+    """Checkpoint for a run starting at the first event"""
+    return {"last_id": None, "processed": 0, "changed": 0, "pending_hours": [], "completed": False}
+
+def load_checkpoint(path: Path) -> Dict[str, Any]:
+    """Load the checkpoint file; a missing or completed checkpoint starts over"""
+    if not path.exists():
+        return new_checkpoint()
+    checkpoint = {**new_checkpoint(), **json.loads(path.read_text())}
+    if checkpoint["completed"]:
+        logger.info("Previous backfill completed; starting from the beginning")
+        return new_checkpoint()
+    return checkpoint
+
+def save_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    """Atomically write the checkpoint file"""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoint))
+    tmp.replace(path)
+
+async def classify_batch(loop, pool: ProcessPoolExecutor, transcripts: List[str],
+                         workers: int) -> List[Tuple[str, int]]:
+    """Split a batch across the pool and return results in input order"""
+    chunk_size = max(1, -(-len(transcripts) // workers))
+    chunks = [transcripts[i:i + chunk_size] for i in range(0, len(transcripts), chunk_size)]
+    results = await asyncio.gather(*[
+        loop.run_in_executor(pool, classify_chunk, chunk) for chunk in chunks
+    ])
+    return [item for chunk in results for item in chunk]
+
+async def backfill(db, batch_size: int, workers: int, dry_run: bool,
+                   checkpoint_path: Optional[Path]) -> Dict[str, Any]:
+    """Run the reclassification backfill
+
+    Args:
+        db: Motor database
+        batch_size: Events per cursor batch and bulk_write
+        workers: Number of classifier processes
+        dry_run: Report changes without writing them
+        checkpoint_path: Checkpoint file, or None to always start from the beginning
+
+    Returns:
+        dict: Final counters, including the category change matrix
+    """
+    checkpoint = load_checkpoint(checkpoint_path) if checkpoint_path else new_checkpoint()
+    if checkpoint["pending_hours"] and not dry_run:
+        # A previous run crashed between rewriting events and fixing their stats
+        logger.info(f"Recomputing stats for {len(checkpoint['pending_hours'])} hours left by an interrupted run")
+        await incident_stats.rebuild_hours(checkpoint["pending_hours"])
+        checkpoint["pending_hours"] = []
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, checkpoint)
+
+    query = {}
+    if checkpoint["last_id"]:
+        query["_id"] = {"$gt": ObjectId(checkpoint["last_id"])}
+        logger.info(f"Resuming after _id {checkpoint['last_id']} ({checkpoint['processed']} already processed)")
+
+    projection = {"_id": 1, "transcript": 1, "type": 1, "severity": 1, "timestamp": 1}
+    cursor = db.events.find(query, projection).sort("_id", 1).batch_size(batch_size)
+
+    transitions: Counter = Counter()
+    processed = changed = 0
+    started = time.monotonic()
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        batch: List[Dict[str, Any]] = []
+
+        async def process(events: List[Dict[str, Any]]) -> None:
+            nonlocal processed, changed
+            results = await classify_batch(loop, pool, [e.get("transcript", "") for e in events], workers)
+            operations = []
+            affected_hours = set()
+            for event, (new_type, new_severity) in zip(events, results):
+                if event.get("type") == new_type and event.get("severity") == new_severity:
+                    continue
+                transitions[(event.get("type"), new_type)] += 1
+                operations.append(UpdateOne(
+                    {"_id": event["_id"]},
+                    {"$set": {"type": new_type, "severity": new_severity,
+                              "reclassified_at": datetime.now(timezone.utc).isoformat()}}
+                ))
+                if isinstance(event.get("timestamp"), str):
+                    affected_hours.add(bucket_start(datetime.fromisoformat(event["timestamp"]), "hour"))
+
+            if operations and not dry_run:
+                # Record the hours to fix before touching events, so a crash
+                # after the write still gets their stats recomputed on resume
+                if checkpoint_path:
+                    checkpoint["pending_hours"] = sorted(affected_hours)
+                    save_checkpoint(checkpoint_path, checkpoint)
+                await db.events.bulk_write(operations, ordered=False)
+                # Recomputed from stored events rather than adjusted by deltas,
+                # so history that predates the rollups is counted correctly.
+                # Failures raise here, before the checkpoint moves on.
+                await incident_stats.rebuild_hours(affected_hours)
+
+            processed += len(events)
+            changed += len(operations)
+            if checkpoint_path and not dry_run:
+                checkpoint["last_id"] = str(events[-1]["_id"])
+                checkpoint["processed"] += len(events)
+                checkpoint["changed"] += len(operations)
+                checkpoint["pending_hours"] = []
+                save_checkpoint(checkpoint_path, checkpoint)
+
+            elapsed = time.monotonic() - started
+            logger.info(f"Processed {processed} events, {changed} "
+                        f"{'would change' if dry_run else 'changed'} "
+                        f"({processed / elapsed if elapsed else 0:.0f} events/s)")
+
+        async for event in cursor:
+            batch.append(event)
+            if len(batch) >= batch_size:
+                await process(batch)
+                batch = []
+        if batch:
+            await process(batch)
+
+    if checkpoint_path and not dry_run:
+        checkpoint["completed"] = True
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    elapsed = time.monotonic() - started
+    return {
+        "processed": processed,
+        "changed": changed,
+        "elapsed_seconds": round(elapsed, 1),
+        "events_per_second": round(processed / elapsed, 1) if elapsed else 0,
+        "transitions": {f"{old} -> {new}": count for (old, new), count in transitions.most_common()},
+    }
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Connect to MongoDB and run the backfill"""
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    incident_stats.set_db(db)
+    try:
+        # Dry runs always scan everything and never touch the checkpoint
+        return await backfill(
+            db, args.batch_size, args.workers, args.dry_run,
+            None if args.dry_run else args.checkpoint
+        )
+    finally:
+        client.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reclassify historical events")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Events per batch (default: 1000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Classifier processes")
+    parser.add_argument("--dry-run", action="store_true", help="Report category changes without writing")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT, help="Checkpoint file path")
+    parser.add_argument("--restart", action="store_true",
+                        help="Start over instead of resuming an interrupted run")
+    args = parser.parse_args()
+
+    if args.restart and args.checkpoint.exists():
+        # Keep hours whose stats still need fixing from the interrupted run
+        pending_hours = json.loads(args.checkpoint.read_text()).get("pending_hours", [])
+        save_checkpoint(args.checkpoint, {**new_checkpoint(), "pending_hours": pending_hours})
+
+    summary = asyncio.run(run(args))
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
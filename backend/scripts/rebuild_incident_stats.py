@@ -0,0 +1,45 @@
+"""Rebuild the incident stats rollups from the events collection
+
+Counts every stored event into the per-minute and per-hour `event_stats`
+rollups, replacing what is there from the oldest event in MongoDB onwards;
+rollups of archived periods are kept. The server does this automatically on
+first start; run it by hand after bulk changes to events. Events added while
+it runs may be counted twice, so prefer running it while the server is idle.
+
+Usage (from the backend directory):
+    python -m scripts.rebuild_incident_stats
+"""
+from dotenv import load_dotenv
+from pathlib import Path
+import os
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+load_dotenv(ROOT_DIR / '.env')
+
+import asyncio
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from services.incident_stats import incident_stats
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+async def run() -> int:
+    """Connect to MongoDB and rebuild the rollups"""
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    incident_stats.set_db(client[os.environ['DB_NAME']])
+    try:
+        return await incident_stats.rebuild()
+    finally:
+        client.close()
+
+def main() -> None:
+    written = asyncio.run(run())
+    print(f"Rebuilt {written} rollup documents")
+
+if __name__ == "__main__":
+    main()
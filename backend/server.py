@@ -7,11 +7,13 @@ ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 from fastapi import FastAPI, APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import logging
+import asyncio
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List
+from typing import List, Optional
 from contextlib import asynccontextmanager
 import uuid
 from datetime import datetime, timezone
@@ -20,6 +22,12 @@ from datetime import datetime, timezone
 from routes.voice import router as voice_router
 from websocket.ws_manager import manager
 from services.event_store import event_store
+from services.provider_client import get_provider_stats
+from services.local_replies import prerender_local_replies
+from services.response_profiles import response_stats
+from services.incident_stats import incident_stats
+from services.event_archive import event_archiver, ARCHIVE_ENABLED, ARCHIVE_DIR
+from services.ndjson_export import build_time_range_query, stream_ndjson, EXPORT_BATCH_SIZE
 
 # Configure logging first
 logging.basicConfig(
@@ -73,12 +81,39 @@ async def lifespan(app: FastAPI):
     
     # Set the database connection for the event store
     event_store.set_db(db)
+    incident_stats.set_db(db)
+    # Indexes, first-start seeding and periodic flushing run in the background
+    stats_task = asyncio.create_task(incident_stats.run())
+    
+    # Move events older than the hot window into the on-disk archive
+    event_archiver.set_db(db)
+    try:
+        await event_archiver.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Error creating archive indexes: {e}")
+    archive_task = None
+    if ARCHIVE_ENABLED and ARCHIVE_DIR is None:
+        logger.error("ARCHIVE_ENABLED is set but ARCHIVE_DIR is not; refusing to start the archiver")
+    elif ARCHIVE_ENABLED:
+        logger.info(f"Archiving events older than the hot window to {ARCHIVE_DIR}")
+        archive_task = asyncio.create_task(event_archiver.run_archiver())
+    
+    # Render audio for the degraded-mode local replies without blocking startup
+    prerender_task = asyncio.create_task(prerender_local_replies())
     
     logger.info("Voice Emergency Assistant Backend started successfully")
     
     yield
     
     # Shutdown
+    prerender_task.cancel()
+    if archive_task:
+        archive_task.cancel()
+    stats_task.cancel()
+    try:
+        await stats_task
+    except asyncio.CancelledError:
+        pass
     if client:
         client.close()
         logger.info("Voice Emergency Assistant Backend shutdown")
@@ -109,6 +144,16 @@ class StatusCheckCreate(BaseModel):
 async def root():
     return {"message": "Voice Emergency Assistant Backend", "status": "operational"}
 
+@api_router.get("/metrics/providers")
+async def provider_metrics():
+    """Provider call counters: hedges, circuit trips and latency percentiles"""
+    return get_provider_stats()
+
+@api_router.get("/metrics/responses")
+async def response_metrics():
+    """Tokens and characters per generated reply, grouped by response profile"""
+    return response_stats.snapshot()
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.model_dump()
@@ -130,6 +175,25 @@ async def get_status_checks():
     
     return status_checks
 
+@api_router.get("/status/export")
+async def export_status_checks(start: Optional[datetime] = None,
+                               end: Optional[datetime] = None,
+                               client_name: Optional[str] = None,
+                               gzip: bool = False):
+    """Stream all status checks as NDJSON without loading them into memory"""
+    query = build_time_range_query("timestamp", start, end)
+    if client_name:
+        query["client_name"] = client_name
+    
+    # Sort on _id (always indexed, insertion order) so the export streams without a blocking sort
+    cursor = db.status_checks.find(query, {"_id": 0}).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    filename = "status_checks.ndjson.gz" if gzip else "status_checks.ndjson"
+    return StreamingResponse(
+        stream_ndjson(cursor, batch_size=EXPORT_BATCH_SIZE, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 # Include voice processing routes
 api_router.include_router(voice_router, tags=["voice"])
 
@@ -0,0 +1,46 @@
+"""Keyword-Based Emergency Classification"""
+import logging
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+def classify_emergency_by_keywords(transcript: str) -> Dict[str, Any]:
+    """Classify emergency type from transcript keywords
+    
+    Args:
+        transcript: Text to classify
+        
+    Returns:
+        dict: Contains type, severity, and initial response
+    """
+    transcript_lower = transcript.lower()
+    
+    # Classify emergency type based on keywords
+    emergency_type = "NORMAL"
+    severity = 1
+    
+    if any(word in transcript_lower for word in ["fire", "flame", "smoke", "burning", "burn"]):
+        emergency_type = "FIRE"
+        severity = 8
+    
+    elif any(word in transcript_lower for word in ["hurt", "blood", "injured", "medical", "breathing", "unconscious", "pain", "heart", "chest"]):
+        emergency_type = "MEDICAL"
+        severity = 7
+    
+    elif any(word in transcript_lower for word in ["attack", "danger", "weapon", "threat", "help", "scared", "assault", "violence"]):
+        emergency_type = "VIOLENCE"
+        severity = 9
+    
+    elif any(word in transcript_lower for word in ["crash", "accident", "collision", "vehicle", "car", "highway", "truck", "bus"]):
+        emergency_type = "ACCIDENT"
+        severity = 6
+    
+    else:
+        severity = 2
+    
+    logger.info(f"Classifier: Type={emergency_type}, Severity={severity}")
+    
+    return {
+        "type": emergency_type,
+        "severity": severity
+    }
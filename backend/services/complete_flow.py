@@ -5,55 +5,90 @@ import uuid
 import io
 import base64
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import asyncio
+from services.classifier import classify_emergency_by_keywords
 from services.elevenlabs_stt import elevenlabs_stt
-from services.gemini_response import gemini_generate_response
-from services.elevenlabs_tts import elevenlabs_tts
+from services.gemini_response import gemini_generate_reply
+from services.elevenlabs_tts import elevenlabs_tts_bytes
 from services.event_store import event_store
+from services.provider_client import stt_provider, gemini_provider, tts_provider
+from services.response_profiles import response_stats
+from services.local_replies import get_local_reply, latency_budget_for
+from websocket.ws_manager import manager
 
 logger = logging.getLogger(__name__)
 
-def classify_emergency_by_keywords(transcript: str) -> Dict[str, Any]:
-    """Classify emergency type from transcript keywords
+# Strong references to late-reply tasks so they are not garbage collected
+_background_tasks = set()
+
+async def generate_reply_with_audio(classification: Dict[str, Any], transcript: str) -> Tuple[str, Optional[str]]:
+    """Generate the Gemini reply and its spoken audio
     
     Args:
-        transcript: Text to classify
+        classification: Result of classify_emergency_by_keywords
+        transcript: Original transcript
         
     Returns:
-        dict: Contains type, severity, and initial response
+        tuple: (assistant_reply, audio_base64 or None if TTS failed)
     """
-    transcript_lower = transcript.lower()
-    
-    # Classify emergency type based on keywords
-    emergency_type = "NORMAL"
-    severity = 1
-    
-    if any(word in transcript_lower for word in ["fire", "flame", "smoke", "burning", "burn"]):
-        emergency_type = "FIRE"
-        severity = 8
-    
-    elif any(word in transcript_lower for word in ["hurt", "blood", "injured", "medical", "breathing", "unconscious", "pain", "heart", "chest"]):
-        emergency_type = "MEDICAL"
-        severity = 7
+    reply = await gemini_provider.call(
+        gemini_generate_reply,
+        classification["type"],
+        classification["severity"],
+        transcript
+    )
+    assistant_reply = reply["text"]
     
-    elif any(word in transcript_lower for word in ["attack", "danger", "weapon", "threat", "help", "scared", "assault", "violence"]):
-        emergency_type = "VIOLENCE"
-        severity = 9
+    # Recorded here, once per delivered reply, not in losing hedged attempts
+    response_stats.record(
+        reply["profile"],
+        prompt_tokens=reply["prompt_tokens"],
+        output_tokens=reply["output_tokens"],
+        characters=len(assistant_reply),
+        truncated=reply["truncated"]
+    )
+    logger.info(f"Gemini response generated: {assistant_reply[:100]}...")
     
-    elif any(word in transcript_lower for word in ["crash", "accident", "collision", "vehicle", "car", "highway", "truck", "bus"]):
-        emergency_type = "ACCIDENT"
-        severity = 6
+    # Audio is optional: a failed or slow TTS call still returns the text reply
+    audio_base64 = None
+    try:
+        audio_bytes = await tts_provider.call(elevenlabs_tts_bytes, assistant_reply)
+        
+        # Encode as base64 for storage
+        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+        logger.info(f"Audio response encoded: {len(audio_base64)} characters")
+    except Exception as audio_error:
+        logger.error(f"Error generating audio response: {audio_error}")
     
-    else:
-        severity = 2
+    return assistant_reply, audio_base64
+
+async def deliver_late_reply(event: Dict[str, Any], generation: asyncio.Task) -> None:
+    """Replace a degraded event's local reply once generation finishes
     
-    logger.info(f"Classifier: Type={emergency_type}, Severity={severity}")
+    Args:
+        event: Stored degraded event, updated in place
+        generation: Running generate_reply_with_audio task
+    """
+    try:
+        assistant_reply, audio_base64 = await generation
+    except Exception as e:
+        logger.error(f"Background generation failed for event {event['id']}: {e}")
+        return
     
-    return {
-        "type": emergency_type,
-        "severity": severity
+    update = {
+        "assistant_reply": assistant_reply,
+        "degraded": False,
+        "processed_at": datetime.now(timezone.utc).isoformat()
     }
+    # Keep the pre-rendered local audio if TTS failed for the late reply
+    if audio_base64:
+        update["audio_response"] = audio_base64
+    event.update(update)
+    await event_store.update_event(event["id"], update)
+    
+    await manager.broadcast(event)
+    logger.info(f"Late reply delivered via WebSocket: {event['id']}")
 
 async def process_voice_complete_flow(audio_data: bytes) -> Dict[str, Any]:
     """Process voice recording through complete flow:
@@ -63,6 +98,10 @@ async def process_voice_complete_flow(audio_data: bytes) -> Dict[str, Any]:
     4. Text-to-Speech (ElevenLabs)
     5. Event Storage & Broadcasting
     
+    Steps 3 and 4 must finish inside the severity's latency budget. If they
+    do not (or fail), a precomputed local reply is returned with degraded=True
+    and the generated reply is pushed over /ws when it arrives.
+    
     Args:
         audio_data: Audio file data
         
@@ -70,46 +109,34 @@ async def process_voice_complete_flow(audio_data: bytes) -> Dict[str, Any]:
         dict: Complete emergency event with all processing results
     """
     try:
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
         logger.info(f"Starting complete voice processing flow with {len(audio_data)} bytes of audio data")
         
         # Step 1: Speech-to-Text using ElevenLabs
-        transcript = elevenlabs_stt(audio_data)
+        transcript = await stt_provider.call(elevenlabs_stt, audio_data)
         logger.info(f"Transcription completed: {transcript[:100]}...")
         
         # Step 2: Classify emergency based on keywords
         classification = classify_emergency_by_keywords(transcript)
         logger.info(f"Emergency classification: {classification}")
         
-        # Step 3: Generate intelligent response using Gemini API
-        assistant_reply = gemini_generate_response(
-            classification["type"],
-            classification["severity"],
-            transcript
-        )
-        logger.info(f"Gemini response generated: {assistant_reply[:100]}...")
-        
-        # Step 4: Generate audio response using ElevenLabs TTS
-        audio_response_stream = elevenlabs_tts(assistant_reply)
+        # Steps 3-4: Gemini response and TTS within the remaining latency budget
+        budget = latency_budget_for(classification["severity"])
+        remaining = budget - (loop.time() - started_at)
+        generation = asyncio.ensure_future(generate_reply_with_audio(classification, transcript))
         
-        # Convert audio stream to base64 for storage/transmission
-        audio_base64 = None
-        if audio_response_stream:
-            try:
-                # Collect all audio chunks
-                audio_chunks = []
-                for chunk in audio_response_stream:
-                    audio_chunks.append(chunk)
-                
-                # Combine chunks into single byte array
-                audio_bytes = b''.join(audio_chunks)
-                
-                # Encode as base64 for storage
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                logger.info(f"Audio response encoded: {len(audio_base64)} characters")
-            except Exception as audio_error:
-                logger.error(f"Error encoding audio response: {audio_error}")
-        
-        logger.info("Audio response generated successfully")
+        degraded = False
+        try:
+            assistant_reply, audio_base64 = await asyncio.wait_for(
+                asyncio.shield(generation), timeout=max(0.0, remaining)
+            )
+        except Exception as generation_error:
+            degraded = True
+            logger.warning(f"Reply not ready within {budget}s budget, using local reply: {generation_error!r}")
+            local = get_local_reply(classification["type"])
+            assistant_reply = local["assistant_reply"]
+            audio_base64 = local["audio_response"]
         
         # Step 5: Create complete event object
         event = {
@@ -119,6 +146,7 @@ async def process_voice_complete_flow(audio_data: bytes) -> Dict[str, Any]:
             "severity": classification["severity"],
             "assistant_reply": assistant_reply,
             "audio_response": audio_base64,  # Include audio response
+            "degraded": degraded,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "processed_at": datetime.now(timezone.utc).isoformat()
         }
@@ -127,8 +155,16 @@ async def process_voice_complete_flow(audio_data: bytes) -> Dict[str, Any]:
         await event_store.add_event(event)
         logger.info(f"Event stored in MongoDB: {event['id']}")
         
+        # Deliver the generated reply unless generation itself failed; it may
+        # have finished while the degraded event was being stored
+        generation_failed = generation.done() and (generation.cancelled() or generation.exception() is not None)
+        if degraded and not generation_failed:
+            task = asyncio.ensure_future(deliver_late_reply(event, generation))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        
         return event
         
     except Exception as e:
         logger.error(f"Error in complete voice processing flow: {e}", exc_info=True)
-        raise Exception(f"Error processing voice: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error processing voice: {str(e)}")
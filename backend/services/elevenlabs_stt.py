@@ -5,7 +5,10 @@ import base64
 import os
 import json
 import hashlib
+import threading
+from collections import OrderedDict
 from typing import Optional
+from services.provider_client import PROVIDER_DEADLINES
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,23 @@ if not ELEVENLABS_API_KEY:
         "ELEVENLABS_API_KEY=your_key_here"
     )
 
+# Transcript cache keyed by audio content hash, so retried uploads skip STT
+STT_CACHE_SIZE = int(os.environ.get("STT_CACHE_SIZE", "256"))
+_transcript_cache: "OrderedDict[str, str]" = OrderedDict()
+# STT runs in executor threads (twice at once when hedged), so guard the cache
+_transcript_cache_lock = threading.Lock()
+
+def audio_content_hash(audio_data: bytes) -> str:
+    """Return a stable hex digest identifying the audio content
+    
+    Args:
+        audio_data: Audio file data
+    
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256(audio_data).hexdigest()
+
 def get_scribe_token() -> Optional[str]:
     """Get a single-use token for ElevenLabs Scribe v2 Realtime
     
@@ -35,7 +55,8 @@ def get_scribe_token() -> Optional[str]:
         
         response = requests.post(
             f"{ELEVENLABS_API_URL}/single-use-token/realtime_scribe",
-            headers=headers
+            headers=headers,
+            timeout=PROVIDER_DEADLINES["scribe_token"]
         )
         
         if response.status_code == 200:
@@ -60,6 +81,15 @@ def elevenlabs_stt(audio_data: bytes) -> str:
     Returns:
         str: Transcribed text
     """
+    audio_hash = audio_content_hash(audio_data)
+    with _transcript_cache_lock:
+        cached = _transcript_cache.get(audio_hash)
+        if cached is not None:
+            _transcript_cache.move_to_end(audio_hash)
+    if cached is not None:
+        logger.info(f"STT cache hit for audio {audio_hash[:12]}")
+        return cached
+    
     try:
         # Try the HTTP API with correct parameters
         headers = {
@@ -82,7 +112,8 @@ def elevenlabs_stt(audio_data: bytes) -> str:
             f"{ELEVENLABS_API_URL}/speech-to-text",
             headers=headers,
             files=files,
-            data=data
+            data=data,
+            timeout=PROVIDER_DEADLINES["stt"]
         )
         
         # Check if request was successful
@@ -90,13 +121,24 @@ def elevenlabs_stt(audio_data: bytes) -> str:
             result = response.json()
             transcript = result.get("text", "")
             logger.info(f"ElevenLabs STT successful: {transcript[:50]}...")
+            
+            if transcript:
+                with _transcript_cache_lock:
+                    _transcript_cache[audio_hash] = transcript
+                    _transcript_cache.move_to_end(audio_hash)
+                    while len(_transcript_cache) > STT_CACHE_SIZE:
+                        _transcript_cache.popitem(last=False)
             return transcript
         else:
             logger.error(f"ElevenLabs STT failed with status {response.status_code}: {response.text}")
-            raise Exception(f"ElevenLabs STT failed: {response.status_code} - {response.text}")
+            # HTTPError keeps the status code so the provider layer can tell 4xx from 5xx
+            raise requests.HTTPError(
+                f"ElevenLabs STT failed: {response.status_code} - {response.text}",
+                response=response
+            )
             
     except Exception as e:
         logger.error(f"Error in ElevenLabs STT: {e}", exc_info=True)
-        raise Exception(f"Error in ElevenLabs STT: {str(e)}")
+        raise Exception(f"Error in ElevenLabs STT: {str(e)}") from e
 
 # Mock STT fallback removed - using only ElevenLabs API for real processing
\ No newline at end of file
@@ -3,6 +3,7 @@ import logging
 import os
 from elevenlabs import ElevenLabs, play
 from typing import Optional, Iterator
+from services.provider_client import PROVIDER_DEADLINES
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,7 @@ def elevenlabs_tts(text: str, voice_id: str = "JBFqnCBsd6RMkjVDRZzb",
         Iterator[bytes]: Audio data stream or None if failed
     """
     try:
-        client = ElevenLabs(api_key=ELEVENLABS_API_KEY)
+        client = ElevenLabs(api_key=ELEVENLABS_API_KEY, timeout=PROVIDER_DEADLINES["tts"])
         
         logger.info(f"Converting text to speech: {text[:50]}...")
         
@@ -51,6 +52,38 @@ def elevenlabs_tts(text: str, voice_id: str = "JBFqnCBsd6RMkjVDRZzb",
         logger.error(f"Error in ElevenLabs TTS: {e}", exc_info=True)
         return None
 
+def elevenlabs_tts_bytes(text: str, voice_id: str = "JBFqnCBsd6RMkjVDRZzb",
+                        model_id: str = "eleven_multilingual_v2",
+                        output_format: str = "mp3_44100_128") -> bytes:
+    """Convert text to speech and return the complete audio
+    
+    Unlike elevenlabs_tts, the stream is fully consumed here and errors are
+    raised, so the whole request runs inside the caller's deadline.
+    
+    Args:
+        text: Text to convert to speech
+        voice_id: Voice ID to use
+        model_id: Model ID to use
+        output_format: Output format
+    
+    Returns:
+        bytes: Encoded audio
+    """
+    client = ElevenLabs(api_key=ELEVENLABS_API_KEY, timeout=PROVIDER_DEADLINES["tts"])
+    
+    logger.info(f"Converting text to speech: {text[:50]}...")
+    
+    audio_stream = client.text_to_speech.convert(
+        text=text,
+        voice_id=voice_id,
+        model_id=model_id,
+        output_format=output_format,
+    )
+    audio_bytes = b''.join(audio_stream)
+    
+    logger.info(f"ElevenLabs TTS successful: {len(audio_bytes)} bytes")
+    return audio_bytes
+
 def play_audio(audio_stream: Iterator[bytes]) -> bool:
     """Play audio stream
     
@@ -0,0 +1,216 @@
+"""Tiered Event Retention: Hot Window in MongoDB, Compressed Archive on Disk"""
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import json_util
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: archived events are deleted from MongoDB, so ARCHIVE_DIR must be
+# set explicitly and point at a persistent disk
+ARCHIVE_ENABLED = os.environ.get("ARCHIVE_ENABLED", "false").lower() == "true"
+ARCHIVE_DIR = Path(os.environ["ARCHIVE_DIR"]) if os.environ.get("ARCHIVE_DIR") else None
+# Events newer than this stay in MongoDB
+ARCHIVE_HOT_DAYS = float(os.environ.get("ARCHIVE_HOT_DAYS", "30"))
+ARCHIVE_INTERVAL_SECONDS = float(os.environ.get("ARCHIVE_INTERVAL_SECONDS", "3600"))
+# Events per archive part; bounds memory for both archiving and scanning
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "200"))
+
+# Text fields stored column-wise; audio goes to a separate binary file and
+# every other field (_id, reclassified_at, ...) to a per-row "extra" column
+COLUMNS = ("id", "transcript", "type", "severity", "assistant_reply",
+           "degraded", "timestamp", "processed_at")
+
+class EventArchiver:
+    """Moves events older than the hot window into date-partitioned archive files
+
+    Layout under the archive root:
+        date=YYYY-MM-DD/part-<first _id>.cols.json.gz   gzip JSON, one list per column
+        date=YYYY-MM-DD/part-<first _id>.audio          raw audio bytes, referenced by
+                                                        audio_offset/audio_length columns
+
+    Fields outside COLUMNS are kept as Extended JSON in the "extra" column, so
+    an archived event round-trips every field of its source document.
+    """
+
+    def __init__(self, root: Optional[Path] = ARCHIVE_DIR, hot_days: float = ARCHIVE_HOT_DAYS,
+                 batch_size: int = ARCHIVE_BATCH_SIZE):
+        self.root = Path(root) if root else None
+        self.hot_days = hot_days
+        self.batch_size = batch_size
+        self.db = None
+
+    def set_db(self, db_client):
+        """Set the database client holding the hot events collection
+
+        Args:
+            db_client: MongoDB database client
+        """
+        self.db = db_client
+
+    async def ensure_indexes(self) -> None:
+        """Index events by timestamp so the age query does not scan the collection"""
+        if self.db is None:
+            return
+        await self.db.events.create_index([("timestamp", ASCENDING)])
+
+    async def archive_once(self) -> int:
+        """Archive and remove all events older than the hot window
+
+        Each batch is written to disk before it is deleted from MongoDB, so a
+        crash can at worst leave an event in both tiers, never in neither.
+
+        Returns:
+            int: Number of events archived
+        """
+        if self.db is None:
+            logger.error("EventArchiver not initialized with database connection")
+            return 0
+        if self.root is None:
+            raise RuntimeError("ARCHIVE_DIR must be set before events can be archived")
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.hot_days)).isoformat()
+        archived = 0
+        while True:
+            cursor = self.db.events.find({"timestamp": {"$lt": cutoff}}).sort("_id", 1).limit(self.batch_size)
+            batch = await cursor.to_list(length=self.batch_size)
+            if not batch:
+                break
+
+            await asyncio.to_thread(self._write_batch, batch)
+            await self.db.events.delete_many({"_id": {"$in": [event["_id"] for event in batch]}})
+            archived += len(batch)
+
+        if archived:
+            logger.info(f"Archived {archived} events older than {cutoff}")
+        return archived
+
+    async def run_archiver(self, interval: float = ARCHIVE_INTERVAL_SECONDS) -> None:
+        """Archive old events every interval seconds until cancelled"""
+        while True:
+            try:
+                await self.archive_once()
+            except Exception as e:
+                logger.error(f"Error archiving events: {e}", exc_info=True)
+            await asyncio.sleep(interval)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        by_date = defaultdict(list)
+        for event in batch:
+            by_date[str(event.get("timestamp", ""))[:10] or "unknown"].append(event)
+        for date, events in by_date.items():
+            self._write_part(date, events)
+
+    def _write_part(self, date: str, events: List[Dict[str, Any]]) -> None:
+        part_dir = self.root / f"date={date}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        # Named after the first _id so a retried batch overwrites its own part
+        name = f"part-{events[0]['_id']}"
+        cols_path = part_dir / f"{name}.cols.json.gz"
+        audio_path = part_dir / f"{name}.audio"
+
+        columns: Dict[str, list] = {column: [] for column in COLUMNS}
+        columns["audio_offset"] = []
+        columns["audio_length"] = []
+        columns["extra"] = []
+
+        audio_tmp = audio_path.with_suffix(".audio.tmp")
+        with open(audio_tmp, "wb") as audio_file:
+            for event in events:
+                for column in COLUMNS:
+                    columns[column].append(event.get(column))
+                extra = {key: value for key, value in event.items()
+                         if key not in COLUMNS and key != "audio_response"}
+                # Extended JSON keeps ObjectId and datetime types intact
+                columns["extra"].append(json_util.dumps(extra) if extra else None)
+                audio = base64.b64decode(event["audio_response"]) if event.get("audio_response") else b""
+                columns["audio_offset"].append(audio_file.tell())
+                columns["audio_length"].append(len(audio))
+                audio_file.write(audio)
+
+        cols_tmp = cols_path.with_suffix(".tmp")
+        with gzip.open(cols_tmp, "wt", encoding="utf-8") as cols_file:
+            json.dump(columns, cols_file, default=str)
+
+        if any(columns["audio_length"]):
+            os.replace(audio_tmp, audio_path)
+        else:
+            audio_tmp.unlink()
+        os.replace(cols_tmp, cols_path)
+
+    def _partitions(self, start: Optional[str], end: Optional[str]) -> List[Path]:
+        if self.root is None or not self.root.exists():
+            return []
+        partitions = []
+        for part_dir in sorted(self.root.glob("date=*")):
+            date = part_dir.name[len("date="):]
+            if (start and date < start[:10]) or (end and date > end[:10]):
+                continue
+            partitions.extend(sorted(part_dir.glob("*.cols.json.gz")))
+        return partitions
+
+    def _load_part(self, cols_path: Path, start: Optional[str], end: Optional[str],
+                   emergency_type: Optional[str], include_audio: bool) -> List[Dict[str, Any]]:
+        with gzip.open(cols_path, "rt", encoding="utf-8") as cols_file:
+            columns = json.load(cols_file)
+
+        # Filter on the needed columns before materialising any rows
+        timestamps = columns["timestamp"]
+        types = columns["type"]
+        selected = [
+            i for i in range(len(columns["id"]))
+            if (not start or (timestamps[i] or "") >= start)
+            and (not end or (timestamps[i] or "") < end)
+            and (not emergency_type or types[i] == emergency_type)
+        ]
+        extras = columns.get("extra") or [None] * len(columns["id"])
+        rows = []
+        for i in selected:
+            row = json_util.loads(extras[i]) if extras[i] else {}
+            row.update({column: columns[column][i] for column in COLUMNS})
+            rows.append(row)
+
+        audio_path = cols_path.with_name(cols_path.name.replace(".cols.json.gz", ".audio"))
+        if include_audio and audio_path.exists():
+            with open(audio_path, "rb") as audio_file:
+                for row, i in zip(rows, selected):
+                    length = columns["audio_length"][i]
+                    if length:
+                        audio_file.seek(columns["audio_offset"][i])
+                        row["audio_response"] = base64.b64encode(audio_file.read(length)).decode("utf-8")
+                    else:
+                        row["audio_response"] = None
+        return rows
+
+    async def scan(self, query_start: Optional[str] = None, query_end: Optional[str] = None,
+                   emergency_type: Optional[str] = None,
+                   include_audio: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate archived events in date order, one part file in memory at a time
+
+        Args:
+            query_start: Inclusive lower bound, UTC isoformat
+            query_end: Exclusive upper bound, UTC isoformat
+            emergency_type: Only yield events of this type
+            include_audio: Attach base64 audio_response to each event
+
+        Yields:
+            Archived event dictionaries
+        """
+        for cols_path in await asyncio.to_thread(self._partitions, query_start, query_end):
+            rows = await asyncio.to_thread(
+                self._load_part, cols_path, query_start, query_end, emergency_type, include_audio
+            )
+            for row in rows:
+                yield row
+
+# Global event archiver instance
+event_archiver = EventArchiver()
@@ -1,9 +1,10 @@
 """MongoDB Event Store Integration"""
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator
 from datetime import datetime
 import asyncio
 from bson import ObjectId
+from services.incident_stats import incident_stats
 
 logger = logging.getLogger(__name__)
 
@@ -48,9 +49,29 @@ class MongoEventStore:
             # Insert into MongoDB collection
             result = await self.db.events.insert_one(event)
             logger.info(f"Event added to MongoDB: {event['id']} with _id {result.inserted_id}")
+            
+            # Count the event in the time-bucketed stats (flushed in batches)
+            incident_stats.record(event)
         except Exception as e:
             logger.error(f"Error adding event to MongoDB: {e}", exc_info=True)
     
+    async def update_event(self, event_id: str, fields: Dict[str, Any]) -> None:
+        """Update fields of a stored event
+        
+        Args:
+            event_id: ID of the event to update
+            fields: Fields to set
+        """
+        if self.db is None:
+            logger.error("MongoEventStore not initialized with database connection")
+            return
+            
+        try:
+            result = await self.db.events.update_one({"id": event_id}, {"$set": fields})
+            logger.info(f"Event {event_id} updated in MongoDB ({result.modified_count} modified)")
+        except Exception as e:
+            logger.error(f"Error updating event in MongoDB: {e}", exc_info=True)
+    
     async def get_events(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent events
         
@@ -80,6 +101,29 @@ class MongoEventStore:
             logger.error(f"Error retrieving events from MongoDB: {e}", exc_info=True)
             return []
     
+    async def iter_events(self, query: Optional[Dict[str, Any]] = None,
+                          include_audio: bool = False,
+                          batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate events in insertion order without materialising the result set
+
+        Args:
+            query: Optional MongoDB filter
+            include_audio: Include the base64 audio_response field
+            batch_size: Number of documents fetched per cursor round trip
+
+        Yields:
+            Event dictionaries
+        """
+        if self.db is None:
+            logger.error("MongoEventStore not initialized with database connection")
+            return
+
+        projection = None if include_audio else {"audio_response": 0}
+        cursor = self.db.events.find(query or {}, projection).sort('_id', 1).batch_size(batch_size)
+        async for event in cursor:
+            event['_id'] = str(event['_id'])
+            yield event
+
     async def clear(self) -> None:
         """Clear all events from store"""
         if self.db is None:
@@ -88,6 +132,7 @@ class MongoEventStore:
             
         try:
             result = await self.db.events.delete_many({})
+            await incident_stats.clear()
             logger.info(f"Cleared {result.deleted_count} events from MongoDB")
         except Exception as e:
             logger.error(f"Error clearing events from MongoDB: {e}", exc_info=True)
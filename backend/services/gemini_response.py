@@ -3,6 +3,10 @@ import logging
 import google.generativeai as genai
 import os
 from typing import Dict, Any
+from services.provider_client import PROVIDER_DEADLINES
+from services.response_profiles import (
+    build_prompt, drop_incomplete_sentence, limit_sentences, select_response_profile
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,8 +37,16 @@ except Exception as e:
         logger.error(f"Failed to initialize fallback model: {e2}")
         model = None
 
-def gemini_generate_response(emergency_type: str, severity: int, transcript: str) -> str:
-    """Generate emergency response using Google Gemini API (no fallback)
+def _hit_token_cap(response) -> bool:
+    """Return True if generation stopped at max_output_tokens"""
+    try:
+        finish_reason = response.candidates[0].finish_reason
+    except (AttributeError, IndexError):
+        return False
+    return getattr(finish_reason, "name", finish_reason) in ("MAX_TOKENS", 2)
+
+def gemini_generate_reply(emergency_type: str, severity: int, transcript: str) -> Dict[str, Any]:
+    """Generate emergency response using Google Gemini API, with usage details
     
     Args:
         emergency_type: Type of emergency (FIRE, MEDICAL, VIOLENCE, ACCIDENT, NORMAL)
@@ -42,7 +54,8 @@ def gemini_generate_response(emergency_type: str, severity: int, transcript: str
         transcript: Original transcript
         
     Returns:
-        str: Generated emergency response
+        dict: text, profile name, prompt/output token counts and whether the
+        reply was shortened by the token cap or sentence limit
     """
     # If model failed to initialize, raise exception
     if model is None:
@@ -50,38 +63,57 @@ def gemini_generate_response(emergency_type: str, severity: int, transcript: str
         raise Exception("Gemini model not available")
     
     try:
-        # Create prompt for Gemini
-        prompt = f"""
-        You are an emergency response assistant. Based on the emergency type and severity, 
-        generate a professional, helpful, and urgent response.
-        
-        Emergency Type: {emergency_type}
-        Severity Level: {severity}/10
-        Original Message: "{transcript}"
+        # Create a compact prompt for the emergency's response profile
+        profile = select_response_profile(emergency_type, severity)
+        prompt = build_prompt(profile, emergency_type, severity, transcript)
         
-        Provide a clear, actionable response that includes:
-        1. Acknowledgment of the emergency type
-        2. Immediate safety advice
-        3. Recommended actions
-        4. Reassurance that help is being dispatched (if applicable)
-        
-        Keep the response concise but comprehensive. Do not include markdown or special formatting.
-        """
-        
-        # Generate response
-        response = model.generate_content(prompt)
+        # Generate response, capped at the profile's output token budget
+        response = model.generate_content(
+            prompt,
+            generation_config={"max_output_tokens": profile["max_output_tokens"]},
+            request_options={"timeout": PROVIDER_DEADLINES["gemini"]}
+        )
         
         if response.text:
-            # Clean up the response
+            # Clean up the response and enforce the sentence limit
             assistant_reply = response.text.strip()
-            logger.info(f"Gemini response generated successfully")
-            return assistant_reply
+            hit_token_cap = _hit_token_cap(response)
+            if hit_token_cap:
+                # Never speak a sentence cut off mid-way by the token cap
+                assistant_reply = drop_incomplete_sentence(assistant_reply)
+            limited_reply = limit_sentences(assistant_reply, profile.get("max_sentences"))
+            # limit_sentences only cuts, so any difference means sentences were dropped
+            truncated = hit_token_cap or limited_reply != assistant_reply
+            assistant_reply = limited_reply
+            
+            usage = getattr(response, "usage_metadata", None)
+            logger.info(f"Gemini response generated with profile {profile['name']}: {len(assistant_reply)} characters")
+            return {
+                "text": assistant_reply,
+                "profile": profile["name"],
+                "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+                "output_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+                "truncated": truncated
+            }
         else:
             logger.error("Gemini returned empty response")
             raise Exception("Gemini returned empty response")
             
     except Exception as e:
         logger.error(f"Error in Gemini response generation: {e}", exc_info=True)
-        raise Exception(f"Error in Gemini response generation: {str(e)}")
+        raise Exception(f"Error in Gemini response generation: {str(e)}") from e
+
+def gemini_generate_response(emergency_type: str, severity: int, transcript: str) -> str:
+    """Generate emergency response using Google Gemini API (no fallback)
+    
+    Args:
+        emergency_type: Type of emergency (FIRE, MEDICAL, VIOLENCE, ACCIDENT, NORMAL)
+        severity: Severity level (1-10)
+        transcript: Original transcript
+        
+    Returns:
+        str: Generated emergency response
+    """
+    return gemini_generate_reply(emergency_type, severity, transcript)["text"]
 
 # Fallback responses removed - using only Gemini API for real processing
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""Idempotent Request Processing"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How long a completed result is replayed for duplicate requests
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "600"))
+# Upper bound on completed results kept in memory (each holds base64 audio)
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "128"))
+
+class IdempotencyCache:
+    """Runs each keyed coroutine at most once and shares its result
+
+    Concurrent callers with the same key await the same in-flight task, and
+    callers arriving after completion get the stored result until it expires.
+    Failed runs are not stored, so a retry after an error runs again.
+    """
+
+    def __init__(self, ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+                 max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._completed: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _get_completed(self, key: str):
+        entry = self._completed.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._completed[key]
+            return None
+        self._completed.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, result: Any) -> None:
+        self._completed[key] = (time.monotonic(), result)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_entries:
+            self._completed.popitem(last=False)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run factory once per key
+
+        Args:
+            key: Idempotency key
+            factory: Zero-argument callable returning the coroutine to run
+
+        Returns:
+            tuple: (result, is_duplicate) where is_duplicate is True if the
+            result came from an earlier or concurrent request
+        """
+        completed = self._get_completed(key)
+        if completed is not None:
+            logger.info(f"Idempotency hit (completed): {key[:16]}")
+            return completed[1], True
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            logger.info(f"Idempotency hit (in flight): {key[:16]}")
+            # Shield so a disconnecting duplicate cannot cancel the shared run
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(factory())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        # Shield so a disconnecting caller cannot cancel the run for waiters
+        return await asyncio.shield(task), False
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+# Global idempotency cache for voice uploads
+voice_idempotency = IdempotencyCache()
@@ -0,0 +1,373 @@
+"""Incrementally Maintained Incident Statistics"""
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from services.event_archive import event_archiver
+
+logger = logging.getLogger(__name__)
+
+STATS_FLUSH_SECONDS = float(os.environ.get("STATS_FLUSH_SECONDS", "10"))
+GRANULARITIES = ("minute", "hour")
+# Timestamp prefix length and suffix that turn a stored ISO timestamp into its bucket key
+BUCKET_FORMATS = {"minute": (16, ":00+00:00"), "hour": (13, ":00:00+00:00")}
+# Hour buckets recomputed per aggregation in rebuild_hours
+REBUILD_HOURS_PER_QUERY = 200
+
+def _as_utc(timestamp: datetime) -> datetime:
+    """Convert to UTC, treating naive values as UTC"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+def bucket_start(timestamp: datetime, granularity: str) -> str:
+    """Floor a timestamp to the start of its minute or hour bucket
+
+    Args:
+        timestamp: Event time (naive values are treated as UTC)
+        granularity: "minute" or "hour"
+
+    Returns:
+        str: UTC isoformat of the bucket start
+    """
+    timestamp = _as_utc(timestamp).replace(second=0, microsecond=0)
+    if granularity == "hour":
+        timestamp = timestamp.replace(minute=0)
+    return timestamp.isoformat()
+
+def _bucket_pipeline(granularity: str, match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Aggregation stages counting matched events per bucket, type and severity"""
+    prefix, suffix = BUCKET_FORMATS[granularity]
+    return [
+        {"$match": {"$and": [{"timestamp": {"$type": "string"}}, match]}},
+        {"$group": {
+            "_id": {
+                "bucket": {"$concat": [{"$substrCP": ["$timestamp", 0, prefix]}, suffix]},
+                "type": {"$ifNull": ["$type", "NORMAL"]},
+                "severity": {"$ifNull": ["$severity", 0]}
+            },
+            "count": {"$sum": 1}
+        }},
+        {"$project": {
+            "_id": 0,
+            "granularity": {"$literal": granularity},
+            "bucket": "$_id.bucket",
+            "type": "$_id.type",
+            "severity": "$_id.severity",
+            "count": 1
+        }}
+    ]
+
+def _bucket_keys(event: Dict[str, Any]) -> List[tuple]:
+    """(granularity, bucket, type, severity) rollup keys an event counts towards"""
+    try:
+        timestamp = datetime.fromisoformat(event["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        timestamp = datetime.now(timezone.utc)
+    return [
+        (granularity, bucket_start(timestamp, granularity),
+         event.get("type", "NORMAL"), int(event.get("severity", 0)))
+        for granularity in GRANULARITIES
+    ]
+
+class IncidentStats:
+    """Time-bucketed event counts by type and severity
+
+    Counts are accumulated in memory as events are stored and periodically
+    upserted into the small `event_stats` rollup collection, so queries read
+    one document per (bucket, type, severity) instead of scanning events.
+    """
+
+    def __init__(self):
+        self.db = None
+        # (granularity, bucket, type, severity) -> count not yet flushed
+        self._pending: Counter = Counter()
+
+    def set_db(self, db_client):
+        """Set the database client used for rollup documents
+
+        Args:
+            db_client: MongoDB database client
+        """
+        self.db = db_client
+
+    async def ensure_indexes(self) -> None:
+        """Create the unique rollup index"""
+        if self.db is None:
+            return
+        await self.db.event_stats.create_index(
+            [("granularity", ASCENDING), ("bucket", ASCENDING),
+             ("type", ASCENDING), ("severity", ASCENDING)],
+            unique=True
+        )
+
+    def record(self, event: Dict[str, Any]) -> None:
+        """Count an event in its minute and hour buckets
+
+        Args:
+            event: Stored event with timestamp, type and severity
+        """
+        for key in _bucket_keys(event):
+            self._pending[key] += 1
+
+    async def flush(self) -> int:
+        """Write pending counts to the rollup collection in one bulk write
+
+        Returns:
+            int: Number of rollup documents touched
+        """
+        if self.db is None or not self._pending:
+            return 0
+
+        # Swap before awaiting so events recorded during the write are kept
+        pending, self._pending = self._pending, Counter()
+        operations = [
+            UpdateOne(
+                {"granularity": g, "bucket": b, "type": t, "severity": s},
+                {"$inc": {"count": count}},
+                upsert=True
+            )
+            for (g, b, t, s), count in pending.items()
+        ]
+        try:
+            await self.db.event_stats.bulk_write(operations, ordered=False)
+            logger.info(f"Flushed {len(operations)} incident stat buckets")
+            return len(operations)
+        except Exception as e:
+            logger.error(f"Error flushing incident stats: {e}", exc_info=True)
+            self._pending.update(pending)
+            return 0
+
+    async def run_flusher(self, interval: float = STATS_FLUSH_SECONDS) -> None:
+        """Flush pending counts every interval seconds until cancelled"""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+
+    async def run(self, interval: float = STATS_FLUSH_SECONDS) -> None:
+        """Prepare the rollup collection, then flush pending counts until cancelled
+
+        Index creation and the first-start seed run here, in the background,
+        so a slow or unreachable MongoDB does not block server startup. The
+        flusher only starts once seeding has finished.
+        """
+        try:
+            await self.ensure_indexes()
+            await self.seed_if_empty()
+        except Exception as e:
+            logger.error(f"Error preparing incident stats: {e}", exc_info=True)
+        await self.run_flusher(interval)
+
+    async def rebuild(self) -> int:
+        """Recompute rollups from the events collection
+
+        Events are grouped server-side by bucket, type and severity into a
+        scratch collection, which then atomically replaces `event_stats`.
+        Bucket keys are taken from the ISO timestamp prefix, which matches
+        bucket_start for the UTC timestamps the pipeline stores.
+
+        Only buckets from the oldest event still in MongoDB onwards are
+        recomputed. Older rollups cover archived events and are carried over
+        unchanged, and archived events sharing a bucket with the oldest live
+        event are counted from the archive. Events added while the rebuild
+        runs may be counted twice, so run it at startup or while the server
+        is idle.
+
+        Returns:
+            int: Number of rollup documents written
+        """
+        if self.db is None:
+            logger.error("IncidentStats not initialized with database connection")
+            return 0
+
+        oldest = await self.db.events.find_one(
+            {"timestamp": {"$type": "string"}}, {"timestamp": 1}, sort=[("timestamp", ASCENDING)]
+        )
+        if oldest is None:
+            logger.info("No events in MongoDB, keeping existing incident stats")
+            return 0
+        bounds = {g: bucket_start(datetime.fromisoformat(oldest["timestamp"]), g) for g in GRANULARITIES}
+
+        scratch = self.db.event_stats_rebuild
+        await scratch.drop()
+        for granularity in GRANULARITIES:
+            await self.db.event_stats.aggregate([
+                {"$match": {"granularity": granularity, "bucket": {"$lt": bounds[granularity]}}},
+                {"$project": {"_id": 0}},
+                {"$merge": {"into": "event_stats_rebuild"}}
+            ]).to_list(length=None)
+            pipeline = _bucket_pipeline(granularity, {}) + [{"$merge": {"into": "event_stats_rebuild"}}]
+            await self.db.events.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+
+        # The boundary hour may be split between the archive and MongoDB
+        archived: Counter = Counter()
+        async for event in event_archiver.scan(query_start=bounds["hour"], query_end=oldest["timestamp"]):
+            for key in _bucket_keys(event):
+                # Earlier buckets were carried over from the old rollups
+                if key[1] >= bounds[key[0]]:
+                    archived[key] += 1
+        if archived:
+            await scratch.bulk_write([
+                UpdateOne({"granularity": g, "bucket": b, "type": t, "severity": s},
+                          {"$inc": {"count": count}}, upsert=True)
+                for (g, b, t, s), count in archived.items()
+            ], ordered=False)
+
+        written = await scratch.count_documents({})
+        if written:
+            await scratch.rename("event_stats", dropTarget=True)
+        else:
+            await self.db.event_stats.delete_many({})
+        await self.ensure_indexes()
+        self._pending.clear()
+        logger.info(f"Rebuilt incident stats from {oldest['timestamp']}: {written} rollup documents")
+        return written
+
+    async def rebuild_hours(self, hours: Iterable[str]) -> int:
+        """Recompute the rollups of specific hours from the events collection
+
+        Both the hour buckets and the minute buckets inside them are set to
+        the counts of the events currently stored for those hours. Unlike
+        rebuild(), rollups of other hours (including archived history) are
+        left untouched. Errors are raised, not swallowed.
+
+        Args:
+            hours: Hour bucket keys as produced by bucket_start(..., "hour")
+
+        Returns:
+            int: Number of rollup documents written
+        """
+        if self.db is None:
+            raise RuntimeError("IncidentStats not initialized with database connection")
+
+        hours = sorted(set(hours))
+        written = 0
+        for i in range(0, len(hours), REBUILD_HOURS_PER_QUERY):
+            chunk = hours[i:i + REBUILD_HOURS_PER_QUERY]
+            ranges = []
+            for hour in chunk:
+                next_hour = datetime.fromisoformat(hour) + timedelta(hours=1)
+                ranges.append((hour, next_hour.isoformat()))
+
+            # Timestamps are compared by their hour prefix so naive and offset
+            # forms of the same hour both match
+            match = {"$or": [{"timestamp": {"$gte": lo[:13], "$lt": hi[:13]}} for lo, hi in ranges]}
+            operations = []
+            for granularity in GRANULARITIES:
+                async for doc in self.db.events.aggregate(_bucket_pipeline(granularity, match)):
+                    operations.append(UpdateOne(
+                        {key: doc[key] for key in ("granularity", "bucket", "type", "severity")},
+                        {"$set": {"count": doc["count"]}},
+                        upsert=True
+                    ))
+
+            # Remove the affected buckets first so categories that lost all
+            # their events do not keep stale counts
+            await self.db.event_stats.delete_many({"$or": [
+                {"granularity": "hour", "bucket": {"$in": chunk}},
+                *[{"granularity": "minute", "bucket": {"$gte": lo, "$lt": hi}} for lo, hi in ranges]
+            ]})
+            if operations:
+                await self.db.event_stats.bulk_write(operations, ordered=False)
+            written += len(operations)
+
+        logger.info(f"Rebuilt incident stats for {len(hours)} hours: {written} rollup documents")
+        return written
+
+    async def seed_if_empty(self) -> None:
+        """Rebuild rollups once when events exist but no rollups do yet"""
+        if self.db is None:
+            return
+        if await self.db.event_stats.estimated_document_count() == 0 and \
+                await self.db.events.estimated_document_count() > 0:
+            logger.info("No incident stats found for existing events, rebuilding rollups")
+            await self.rebuild()
+
+    async def clear(self) -> None:
+        """Drop all rollups and pending counts"""
+        self._pending.clear()
+        if self.db is not None:
+            await self.db.event_stats.delete_many({})
+
+    async def query(self, granularity: str = "hour",
+                    start: Optional[datetime] = None,
+                    end: Optional[datetime] = None,
+                    emergency_type: Optional[str] = None,
+                    severity: Optional[int] = None) -> Dict[str, Any]:
+        """Return counts per bucket, by type and severity
+
+        Flushed rollups are combined with not-yet-flushed counts so results
+        are current.
+
+        Args:
+            granularity: "minute" or "hour"
+            start: Inclusive lower bound
+            end: Exclusive upper bound
+            emergency_type: Only count this type
+            severity: Only count this severity
+
+        Returns:
+            dict: buckets (ordered by time) and overall totals
+        """
+        start_key = bucket_start(start, granularity) if start else None
+        end_key = _as_utc(end).isoformat() if end else None
+
+        query: Dict[str, Any] = {"granularity": granularity}
+        bounds = {}
+        if start_key:
+            bounds["$gte"] = start_key
+        if end_key:
+            bounds["$lt"] = end_key
+        if bounds:
+            query["bucket"] = bounds
+        if emergency_type:
+            query["type"] = emergency_type
+        if severity is not None:
+            query["severity"] = severity
+
+        counts: Counter = Counter()
+        if self.db is not None:
+            async for doc in self.db.event_stats.find(query, {"_id": 0}):
+                counts[(doc["bucket"], doc["type"], doc["severity"])] += doc["count"]
+
+        for (g, b, t, s), count in self._pending.items():
+            if g != granularity or (start_key and b < start_key) or (end_key and b >= end_key):
+                continue
+            if (emergency_type and t != emergency_type) or (severity is not None and s != severity):
+                continue
+            counts[(b, t, s)] += count
+
+        buckets: Dict[str, Dict[str, Any]] = {}
+        by_type: Counter = Counter()
+        by_severity: Counter = Counter()
+        for (b, t, s), count in counts.items():
+            entry = buckets.setdefault(b, {"bucket": b, "total": 0, "by_type": Counter(), "by_severity": Counter()})
+            entry["total"] += count
+            entry["by_type"][t] += count
+            entry["by_severity"][str(s)] += count
+            by_type[t] += count
+            by_severity[str(s)] += count
+
+        ordered: List[Dict[str, Any]] = [
+            {**entry, "by_type": dict(entry["by_type"]), "by_severity": dict(entry["by_severity"])}
+            for _, entry in sorted(buckets.items())
+        ]
+        return {
+            "granularity": granularity,
+            "buckets": ordered,
+            "total": sum(by_type.values()),
+            "by_type": dict(by_type),
+            "by_severity": dict(by_severity),
+        }
+
+# Global incident statistics instance
+incident_stats = IncidentStats()
@@ -0,0 +1,88 @@
+"""Precomputed Local Replies for Degraded Responses"""
+import asyncio
+import base64
+import logging
+import os
+from typing import Dict, Optional
+
+from services.elevenlabs_tts import elevenlabs_tts_bytes
+
+logger = logging.getLogger(__name__)
+
+# End-to-end latency budgets in seconds, tighter for more severe emergencies
+LATENCY_BUDGET_CRITICAL = float(os.environ.get("LATENCY_BUDGET_CRITICAL_SECONDS", "6"))
+LATENCY_BUDGET_HIGH = float(os.environ.get("LATENCY_BUDGET_HIGH_SECONDS", "8"))
+LATENCY_BUDGET_LOW = float(os.environ.get("LATENCY_BUDGET_LOW_SECONDS", "12"))
+
+# One reply per classify_emergency_by_keywords category
+LOCAL_REPLIES = {
+    "FIRE": (
+        "This sounds like a fire emergency. Leave the building now and stay low to avoid smoke. "
+        "Do not use elevators. Close doors behind you and call emergency services once you are outside. "
+        "Help is being dispatched."
+    ),
+    "MEDICAL": (
+        "This sounds like a medical emergency. Call emergency services now. "
+        "Keep the person still and check that they are breathing. Apply firm pressure to any bleeding. "
+        "Stay with them until help arrives."
+    ),
+    "VIOLENCE": (
+        "Your safety comes first. Move to a safe place and lock the door if you can. "
+        "Stay quiet and call emergency services as soon as it is safe. "
+        "Help is being dispatched."
+    ),
+    "ACCIDENT": (
+        "This sounds like an accident. Move away from traffic if it is safe and turn on hazard lights. "
+        "Do not move injured people unless they are in danger. Call emergency services now."
+    ),
+    "NORMAL": (
+        "Thank you for your message. If anyone is in danger, call emergency services immediately. "
+        "Otherwise, stay where you are and we will follow up shortly."
+    ),
+}
+
+# Base64 audio for each local reply, filled in by prerender_local_replies
+_local_audio: Dict[str, Optional[str]] = {}
+
+def latency_budget_for(severity: int) -> float:
+    """Return the end-to-end latency budget for a severity level
+
+    Args:
+        severity: Severity level (1-10)
+
+    Returns:
+        float: Budget in seconds
+    """
+    if severity >= 8:
+        return LATENCY_BUDGET_CRITICAL
+    if severity >= 6:
+        return LATENCY_BUDGET_HIGH
+    return LATENCY_BUDGET_LOW
+
+def get_local_reply(emergency_type: str) -> Dict[str, Optional[str]]:
+    """Return the precomputed reply and its audio for an emergency type
+
+    Args:
+        emergency_type: Type of emergency (FIRE, MEDICAL, VIOLENCE, ACCIDENT, NORMAL)
+
+    Returns:
+        dict: Contains assistant_reply and audio_response (base64 or None)
+    """
+    key = emergency_type if emergency_type in LOCAL_REPLIES else "NORMAL"
+    return {
+        "assistant_reply": LOCAL_REPLIES[key],
+        "audio_response": _local_audio.get(key)
+    }
+
+async def prerender_local_replies() -> None:
+    """Render audio for every local reply so degraded responses can be spoken"""
+    for emergency_type, text in LOCAL_REPLIES.items():
+        try:
+            # Called directly, not through tts_provider, so warm-up failures
+            # neither skew latency stats nor open the circuit for live callers
+            audio_bytes = await asyncio.to_thread(elevenlabs_tts_bytes, text)
+            _local_audio[emergency_type] = base64.b64encode(audio_bytes).decode('utf-8')
+        except Exception as e:
+            logger.error(f"Failed to pre-render local reply for {emergency_type}: {e}")
+
+    logger.info(f"Pre-rendered audio for {len(_local_audio)}/{len(LOCAL_REPLIES)} local replies")
@@ -0,0 +1,93 @@
+"""Streaming NDJSON Export Helpers"""
+import json
+import logging
+import os
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional
+
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+# Number of documents pulled from the cursor and written per response chunk
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "500"))
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values json cannot handle natively (ObjectId, datetime)"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def to_utc_iso(value: datetime) -> str:
+    """Format a datetime as a UTC isoformat string (naive values are treated as UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+def build_time_range_query(field: str,
+                           start: Optional[datetime] = None,
+                           end: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build a Mongo range filter on an ISO-8601 timestamp field
+
+    Timestamps are stored as UTC isoformat strings, so bounds are normalised
+    to the same representation and compared lexicographically.
+
+    Args:
+        field: Name of the timestamp field
+        start: Inclusive lower bound (naive values are treated as UTC)
+        end: Exclusive upper bound (naive values are treated as UTC)
+
+    Returns:
+        dict: Query fragment, empty if no bounds were given
+    """
+    bounds = {}
+    if start is not None:
+        bounds["$gte"] = to_utc_iso(start)
+    if end is not None:
+        bounds["$lt"] = to_utc_iso(end)
+    return {field: bounds} if bounds else {}
+
+async def stream_ndjson(documents: AsyncIterable[Dict[str, Any]],
+                        batch_size: int = EXPORT_BATCH_SIZE,
+                        compress: bool = False) -> AsyncIterator[bytes]:
+    """Encode documents as NDJSON, yielding one chunk per batch
+
+    Only one batch of encoded lines is held in memory at a time, so the
+    export size is bounded by the batch size rather than the result set.
+
+    Args:
+        documents: Async iterable of documents (e.g. a Motor cursor)
+        batch_size: Number of documents per yielded chunk
+        compress: Gzip the stream when True
+
+    Yields:
+        bytes: NDJSON (optionally gzip-compressed) chunks
+    """
+    # wbits=31 produces a gzip container instead of a raw zlib stream
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = []
+    count = 0
+
+    def flush() -> bytes:
+        payload = "".join(buffer).encode("utf-8")
+        buffer.clear()
+        return compressor.compress(payload) if compressor else payload
+
+    async for doc in documents:
+        buffer.append(json.dumps(doc, default=_json_default) + "\n")
+        count += 1
+        if len(buffer) >= batch_size:
+            chunk = flush()
+            if chunk:
+                yield chunk
+
+    chunk = flush() if buffer else b""
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+    logger.info(f"NDJSON export finished: {count} documents")
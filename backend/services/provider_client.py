@@ -0,0 +1,274 @@
+"""Resilient Provider Calls: Deadlines, Hedged Requests and Circuit Breakers"""
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Network-level failures raised by the HTTP clients the provider SDKs use
+_TRANSPORT_ERRORS = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+try:
+    import httpx
+    _TRANSPORT_ERRORS += (httpx.TransportError,)
+except ImportError:
+    pass
+
+# Per-stage deadlines in seconds; also used as HTTP timeouts by the service modules
+PROVIDER_DEADLINES = {
+    "stt": float(os.environ.get("STT_DEADLINE_SECONDS", "15")),
+    "scribe_token": float(os.environ.get("SCRIBE_TOKEN_DEADLINE_SECONDS", "5")),
+    "gemini": float(os.environ.get("GEMINI_DEADLINE_SECONDS", "10")),
+    "tts": float(os.environ.get("TTS_DEADLINE_SECONDS", "10")),
+}
+
+HEDGING_ENABLED = os.environ.get("HEDGING_ENABLED", "true").lower() == "true"
+# Samples needed before the observed p95 replaces the default hedge delay
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+
+class ProviderTimeoutError(Exception):
+    """Raised when a provider call does not finish within its deadline"""
+
+class CircuitOpenError(Exception):
+    """Raised when a provider call is rejected because its circuit is open"""
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status carried by an SDK or requests exception, if any"""
+    for candidate in (getattr(exc, "status_code", None), getattr(exc, "code", None),
+                      getattr(getattr(exc, "response", None), "status_code", None)):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True if an error means the provider itself is slow or unhealthy
+
+    Timeouts, connection failures, 429 and 5xx responses are retryable. Client
+    errors such as a 400 for empty audio are not: a second attempt would fail
+    the same way and the provider is working fine. Wrapped errors are
+    inspected through their __cause__/__context__ chain.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (TimeoutError, ConnectionError, ProviderTimeoutError)):
+            return True
+        if isinstance(exc, _TRANSPORT_ERRORS):
+            return True
+        status = _status_code(exc)
+        if status is not None:
+            return status == 429 or status >= 500
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            # Let one probe through; its outcome closes or re-opens the circuit
+            self.state = self.HALF_OPEN
+            return True
+        if self.state == self.HALF_OPEN:
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+                logger.warning(f"Circuit opened after {self.consecutive_failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+class ProviderClient:
+    """Runs blocking provider calls off the event loop with resilience policies
+
+    Each call gets a deadline. If hedging is enabled and the first attempt is
+    still running after the observed p95 latency, a second attempt is started
+    and whichever succeeds first wins. Attempts that fail are not retried. A circuit breaker
+    rejects calls immediately while the provider keeps failing. Errors the
+    retryable predicate rejects (client errors) are raised at once, without
+    hedging and without counting against the circuit.
+    """
+
+    def __init__(self, name: str, deadline: float, hedging: bool = HEDGING_ENABLED,
+                 retryable: Callable[[BaseException], bool] = is_retryable):
+        self.name = name
+        self.deadline = deadline
+        self.hedging = hedging
+        self.retryable = retryable
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.failures = 0
+        self.client_errors = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.rejections = 0
+
+    def hedge_delay(self) -> float:
+        """Delay before sending a hedged request"""
+        if len(self.latency.samples) < HEDGE_MIN_SAMPLES:
+            return self.deadline / 2
+        return self.latency.percentile(95)
+
+    async def call(self, fn: Callable[..., Any], *args, deadline: Optional[float] = None, **kwargs) -> Any:
+        """Call a blocking provider function under this client's policies
+
+        Args:
+            fn: Blocking function performing the provider request
+            *args: Positional arguments for fn
+            deadline: Override for the stage deadline in seconds
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: The provider's circuit is open
+            ProviderTimeoutError: No attempt succeeded within the deadline
+            Exception: A non-retryable error from fn, raised unchanged
+        """
+        if not self.breaker.allow():
+            self.rejections += 1
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline_at = start + (deadline if deadline is not None else self.deadline)
+        hedge_at = start + self.hedge_delay()
+
+        def launch() -> asyncio.Future:
+            return loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+        primary = launch()
+        pending = {primary}
+        hedged = not self.hedging
+        errors = []
+
+        while pending:
+            remaining = deadline_at - loop.time()
+            if remaining <= 0:
+                break
+            wait_for = remaining if hedged else min(remaining, max(0.0, hedge_at - loop.time()))
+            done, pending = await asyncio.wait(pending, timeout=wait_for,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None:
+                    elapsed = loop.time() - start
+                    self.latency.add(elapsed)
+                    self.breaker.record_success()
+                    if fut is not primary:
+                        self.hedge_wins += 1
+                    self._abandon(pending)
+                    return fut.result()
+                error = fut.exception()
+                if not self.retryable(error):
+                    # The provider answered; the request itself was bad
+                    self.client_errors += 1
+                    self.breaker.record_success()
+                    self._abandon(pending)
+                    raise error
+                errors.append(error)
+
+            # Only a slow primary is hedged. One that already failed (e.g. 429 or
+            # 5xx) is not resent, so a struggling provider never sees extra load
+            if not hedged and primary in pending and loop.time() >= hedge_at:
+                hedged = True
+                self.hedges += 1
+                logger.info(f"Hedging {self.name} request after {loop.time() - start:.2f}s")
+                pending.add(launch())
+
+        self.failures += 1
+        self.breaker.record_failure()
+        self._abandon(pending)
+
+        if pending or not errors:
+            self.timeouts += 1
+            raise ProviderTimeoutError(f"{self.name} did not respond within {deadline_at - start:.1f}s")
+        raise errors[-1]
+
+    @staticmethod
+    def _abandon(pending) -> None:
+        # Losing attempts keep running in their threads; retrieve their
+        # exceptions so they are not reported as unhandled
+        for fut in pending:
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of call counters and latency percentiles"""
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "client_errors": self.client_errors,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "circuit_state": self.breaker.state,
+            "circuit_trips": self.breaker.trips,
+            "circuit_rejections": self.rejections,
+            "deadline_ms": ms(self.deadline),
+            "hedge_delay_ms": ms(self.hedge_delay()),
+            "p50_ms": ms(self.latency.percentile(50)),
+            "p95_ms": ms(self.latency.percentile(95)),
+            "p99_ms": ms(self.latency.percentile(99)),
+        }
+
+# Global provider clients, one per pipeline stage
+stt_provider = ProviderClient("stt", PROVIDER_DEADLINES["stt"])
+gemini_provider = ProviderClient("gemini", PROVIDER_DEADLINES["gemini"])
+tts_provider = ProviderClient("tts", PROVIDER_DEADLINES["tts"])
+
+def get_provider_stats() -> Dict[str, Dict[str, Any]]:
+    """Return stats for all provider clients"""
+    return {client.name: client.stats() for client in (stt_provider, gemini_provider, tts_provider)}
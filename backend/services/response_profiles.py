@@ -0,0 +1,172 @@
+"""Severity-Tuned Response Profiles for Gemini Replies"""
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Severity at or above which the "<TYPE>/critical" profile is preferred
+CRITICAL_SEVERITY = 8
+
+# Compact prompt: no indentation whitespace, every token carries meaning
+DEFAULT_TEMPLATE = (
+    "You are an emergency response assistant.\n"
+    "Emergency: {emergency_type}, severity {severity}/10.\n"
+    "Caller said: \"{transcript}\"\n"
+    "Reply in plain text, at most {max_sentences} short sentences: acknowledge the emergency, "
+    "give immediate safety advice and next actions, and say help is being dispatched if applicable."
+)
+
+DEFAULT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {"max_output_tokens": 160, "max_sentences": 4},
+    "FIRE": {"max_output_tokens": 120, "max_sentences": 4},
+    "MEDICAL": {"max_output_tokens": 140, "max_sentences": 4},
+    "VIOLENCE": {"max_output_tokens": 100, "max_sentences": 3},
+    "ACCIDENT": {"max_output_tokens": 120, "max_sentences": 4},
+    "NORMAL": {"max_output_tokens": 80, "max_sentences": 2},
+}
+
+def _load_profiles() -> Dict[str, Dict[str, Any]]:
+    """Merge RESPONSE_PROFILES_JSON overrides onto the default profiles"""
+    profiles = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+    overrides = os.environ.get("RESPONSE_PROFILES_JSON")
+    if not overrides:
+        return profiles
+    try:
+        parsed = json.loads(overrides)
+        for name, profile in parsed.items():
+            profiles.setdefault(name, {}).update(profile)
+        logger.info(f"Loaded response profile overrides for: {', '.join(parsed)}")
+    except (ValueError, AttributeError) as e:
+        logger.error(f"Ignoring invalid RESPONSE_PROFILES_JSON: {e}")
+    return profiles
+
+RESPONSE_PROFILES = _load_profiles()
+
+def select_response_profile(emergency_type: str, severity: int) -> Dict[str, Any]:
+    """Pick the response profile for an emergency
+
+    Lookup order is "<TYPE>/critical" (for critical severities), "<TYPE>",
+    then "default". Missing fields fall back to the default profile.
+
+    Args:
+        emergency_type: Type of emergency (FIRE, MEDICAL, VIOLENCE, ACCIDENT, NORMAL)
+        severity: Severity level (1-10)
+
+    Returns:
+        dict: Profile with name, template, max_output_tokens and max_sentences
+    """
+    candidates = [emergency_type]
+    if severity >= CRITICAL_SEVERITY:
+        candidates.insert(0, f"{emergency_type}/critical")
+
+    name = next((c for c in candidates if c in RESPONSE_PROFILES), "default")
+    profile = {"template": DEFAULT_TEMPLATE, **RESPONSE_PROFILES["default"], **RESPONSE_PROFILES[name]}
+    profile["name"] = name
+    return profile
+
+def build_prompt(profile: Dict[str, Any], emergency_type: str, severity: int, transcript: str) -> str:
+    """Render the profile's prompt template"""
+    return profile["template"].format(
+        emergency_type=emergency_type,
+        severity=severity,
+        transcript=transcript,
+        max_sentences=profile.get("max_sentences") or "a few"
+    )
+
+# Sentence-final punctuation, optionally followed by closing quotes or brackets
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s|$)")
+# Words whose trailing period does not end a sentence ("St. Mary's", "Dr. Smith")
+_ABBREVIATIONS = {
+    "dr", "mr", "mrs", "ms", "prof", "st", "mt", "ave", "rd", "blvd", "hwy",
+    "apt", "no", "jr", "sr", "vs", "approx", "dept", "e.g", "i.e", "a.m", "p.m", "u.s"
+}
+
+def _sentence_ends(text: str) -> List[int]:
+    """Offsets just past each sentence-ending punctuation mark in text"""
+    ends = []
+    for match in _SENTENCE_END.finditer(text):
+        if text[match.start()] == ".":
+            preceding = text[:match.start()].split()
+            word = preceding[-1].lstrip("\"'([").lower() if preceding else ""
+            # Abbreviations and initials ("J. Smith") continue the sentence
+            if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                continue
+        ends.append(match.end())
+    return ends
+
+def limit_sentences(text: str, max_sentences: Optional[int]) -> str:
+    """Truncate text to at most max_sentences sentences
+
+    The text is cut, not re-joined, so an untruncated reply is returned
+    exactly as given (apart from surrounding whitespace).
+
+    Args:
+        text: Reply text
+        max_sentences: Sentence limit, or None for no limit
+
+    Returns:
+        str: Possibly shortened text
+    """
+    text = text.strip()
+    if not max_sentences:
+        return text
+    ends = _sentence_ends(text)
+    if len(ends) < max_sentences:
+        return text
+    return text[:ends[max_sentences - 1]]
+
+def drop_incomplete_sentence(text: str) -> str:
+    """Remove a trailing sentence fragment, e.g. after hitting the token cap
+
+    Args:
+        text: Reply text that may end mid-sentence
+
+    Returns:
+        str: Text up to the last complete sentence, or the original text if it
+        contains no complete sentence at all
+    """
+    text = text.strip()
+    ends = _sentence_ends(text)
+    if not ends:
+        return text
+    return text[:ends[-1]]
+
+class ResponseStats:
+    """Per-profile totals of tokens and characters for generated replies"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def record(self, profile_name: str, prompt_tokens: int, output_tokens: int,
+               characters: int, truncated: bool) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(profile_name, {
+                "replies": 0, "prompt_tokens": 0, "output_tokens": 0,
+                "characters": 0, "truncated": 0
+            })
+            totals["replies"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["output_tokens"] += output_tokens
+            totals["characters"] += characters
+            totals["truncated"] += int(truncated)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Totals and per-reply averages for each profile"""
+        with self._lock:
+            result = {}
+            for name, totals in self._totals.items():
+                replies = totals["replies"] or 1
+                result[name] = {
+                    **totals,
+                    "avg_output_tokens": round(totals["output_tokens"] / replies, 1),
+                    "avg_characters": round(totals["characters"] / replies, 1),
+                }
+            return result
+
+# Global response statistics
+response_stats = ResponseStats()
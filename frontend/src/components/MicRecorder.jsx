@@ -51,6 +51,7 @@ const MicRecorder = ({ onResult, onError }) => {
   const processRecording = async (audioBlob) => {
     setIsProcessing(true);
     try {
+      // No Idempotency-Key: the backend deduplicates retries by audio content hash
       const result = await processVoice(audioBlob);
       onResult(result);
     } catch (error) {
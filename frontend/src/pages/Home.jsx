@@ -11,6 +11,8 @@ const Home = () => {
   const [events, setEvents] = useState([]);
   const [wsConnected, setWsConnected] = useState(false);
   const wsRef = useRef(null);
+  // IDs of events already shown, so late-reply updates are not announced twice
+  const eventIdsRef = useRef(new Set());
 
   // Initialize WebSocket connection
   useEffect(() => {
@@ -31,11 +33,22 @@ const Home = () => {
             
             // Only process valid emergency events (skip hot-reload messages)
             if (newEvent.id && newEvent.transcript && newEvent.type) {
-              // Add new event to the beginning of the list
-              setEvents((prev) => [newEvent, ...prev]);
+              // Replace an existing event (late reply for a degraded response),
+              // otherwise add the new event to the beginning of the list
+              const isUpdate = eventIdsRef.current.has(newEvent.id);
+              eventIdsRef.current.add(newEvent.id);
               
-              // Show notification for high severity events
-              if (newEvent.severity >= 7) {
+              setEvents((prev) =>
+                prev.some((e) => e.id === newEvent.id)
+                  ? prev.map((e) => (e.id === newEvent.id ? newEvent : e))
+                  : [newEvent, ...prev]
+              );
+              setCurrentEvent((current) =>
+                current && current.id === newEvent.id ? newEvent : current
+              );
+              
+              // Show notification for new high severity events (not late-reply updates)
+              if (!isUpdate && newEvent.severity >= 7) {
                 toast.error(`High Severity ${newEvent.type} Event Detected!`, {
                   description: newEvent.transcript.substring(0, 100),
                 });
@@ -83,6 +96,7 @@ const Home = () => {
     const loadEvents = async () => {
       try {
         const data = await getEvents(50);
+        (data.events || []).forEach((e) => eventIdsRef.current.add(e.id));
         setEvents(data.events || []);
       } catch (error) {
         console.error('Error loading events:', error);
@@ -6,9 +6,10 @@ const API = `${BACKEND_URL}/api`;
 /**
  * Send audio recording to backend for processing
  * @param {Blob} audioBlob - Audio blob from recording
+ * @param {string} [idempotencyKey] - Key shared by retries of the same recording
  * @returns {Promise} - Promise with emergency event data
  */
-export const processVoice = async (audioBlob) => {
+export const processVoice = async (audioBlob, idempotencyKey) => {
   const formData = new FormData();
   formData.append('audio', audioBlob, 'recording.webm');
 
@@ -16,6 +17,7 @@ export const processVoice = async (audioBlob) => {
     const response = await axios.post(`${API}/voice`, formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
+        ...(idempotencyKey && { 'Idempotency-Key': idempotencyKey }),
       },
     });
     return response.data;